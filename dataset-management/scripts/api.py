@@ -0,0 +1 @@
+../../scripts/api.py
\ No newline at end of file
@@ -5,20 +5,26 @@ Provides reusable functions for batching large operations that exceed
 the 100-item API limit.
 """
 
-import os
 import sys
+import threading
 import requests
-from typing import List, Dict, Any, Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Sized, TextIO, Tuple, TypeVar
 
-from secrets import SecretString, safe_error_message
-from api import get_headers, list_projects
+from secrets import safe_error_message
+from envs import get_env
+from api import AdaptiveLimiter, CircuitBreaker, create_session, list_projects, post_json, read_error_text
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 def get_freeplay_config(project_id: str = None) -> Dict[str, Any]:
     """Get Freeplay configuration from environment variables.
 
     Args:
-        project_id: Project ID (required)
+        project_id: Project ID (required; defaults to FREEPLAY_PROJECT_ID)
 
     Returns:
         Dict with api_key (SecretString), api_base, and project_id
@@ -26,18 +32,9 @@ def get_freeplay_config(project_id: str = None) -> Dict[str, Any]:
     Raises:
         SystemExit if required environment variables are missing
     """
-    api_key = SecretString(os.environ.get("FREEPLAY_API_KEY"))
-    api_base = os.environ.get("FREEPLAY_BASE_URL", "https://app.freeplay.ai")
-
-    missing = []
-    if not api_key:
-        missing.append("FREEPLAY_API_KEY")
-    if not api_base:
-        missing.append("FREEPLAY_BASE_URL")
-
-    if missing:
-        print(f"Error: Missing environment variables: {', '.join(missing)}", file=sys.stderr)
-        sys.exit(1)
+    env = get_env()
+    api_key, api_base = env.api_key, env.api_base
+    project_id = project_id or env.project_id
 
     if not project_id:
         print("No project ID provided. Pass project_id to get_freeplay_config().", file=sys.stderr)
@@ -52,61 +49,162 @@ def get_freeplay_config(project_id: str = None) -> Dict[str, Any]:
     }
 
 
-def batch_create_test_cases(
-    test_cases: List[Dict[str, Any]],
-    dataset_type: str,
-    dataset_id: str,
+_report_lock = threading.Lock()
+
+
+def _report(*lines: str, file: Optional[TextIO] = None) -> None:
+    """Print lines as one block so output from concurrent batches doesn't interleave."""
+    with _report_lock:
+        print("\n".join(lines), file=file, flush=True)
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield successive lists of up to size items.
+
+    Works on any iterable, so generators are batched lazily without
+    materializing the whole input.
+    """
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def count_batches(items: Iterable[Any], size: int) -> Any:
+    """Number of batches for items, or "?" if the length isn't known upfront."""
+    return (len(items) + size - 1) // size if isinstance(items, Sized) else "?"
+
+
+def run_batches(
+    post_batch: Callable[[int, List[T]], R],
+    items: Iterable[T],
+    batch_size: int,
+    max_concurrency: int
+) -> List[R]:
+    """Call post_batch(batch_num, batch) for each batch on a thread pool.
+
+    The calling thread pulls batches from items (parsing them, if items is
+    a generator over a file) while workers send earlier ones, so reading
+    and uploading overlap. At most 2 * max_concurrency batches are queued
+    at once, keeping memory bounded regardless of input size.
+
+    Returns:
+        post_batch results, in completion order
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        pending = set()
+        for batch_num, batch in enumerate(chunked(items, batch_size), 1):
+            if len(pending) >= 2 * max_concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results.extend(future.result() for future in done)
+            pending.add(executor.submit(post_batch, batch_num, batch))
+        results.extend(future.result() for future in wait(pending).done)
+    return results
+
+
+def bulk_request(
+    session: requests.Session,
+    url: str,
+    items: Iterable[Dict[str, Any]],
+    payload_key: str = "data",
     batch_size: int = 100,
+    max_concurrency: int = 10,
+    rpm_limit: Optional[int] = None,
     verbose: bool = True
-) -> int:
-    """Create test cases in batches.
+) -> List[Tuple[int, Optional[int]]]:
+    """Send items to a bulk endpoint in concurrent, rate-limited batches.
+
+    Each batch is POSTed as {payload_key: batch} via post_json(), which
+    retries transient failures. A 201 response counts as success, and the
+    number of items processed is read from its "data" list.
 
     Args:
-        test_cases: List of test case dicts
-        dataset_type: "prompt-datasets" or "agent-datasets"
-        dataset_id: The dataset ID
+        session: Session to send requests with (see create_session())
+        url: Bulk endpoint URL
+        items: Iterable of items (lists or generators)
+        payload_key: Request body key holding each batch
         batch_size: Number of items per batch (max 100)
+        max_concurrency: Maximum number of batch requests in flight at once
+        rpm_limit: Optional cap on requests per minute
         verbose: Whether to print progress
 
     Returns:
-        Number of successfully created test cases
+        (batch size, processed count or None if the batch failed) per batch
     """
-    config = get_freeplay_config()
-    headers = get_headers(config["api_key"])
+    limiter = AdaptiveLimiter(max_concurrency=max_concurrency, rpm_limit=rpm_limit)
+    breaker = CircuitBreaker()
 
-    total_uploaded = 0
-    total_batches = (len(test_cases) + batch_size - 1) // batch_size
-
-    for i in range(0, len(test_cases), batch_size):
-        batch = test_cases[i:i + batch_size]
-        batch_num = i // batch_size + 1
-
-        url = f"{config['api_base']}/api/v2/projects/{config['project_id']}/{dataset_type}/{dataset_id}/test-cases/bulk"
+    total_batches = count_batches(items, batch_size)
 
+    def post_batch(batch_num: int, batch: List[Dict[str, Any]]) -> Tuple[int, Optional[int]]:
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json={"data": batch},
-                timeout=30
-            )
-
-            if response.status_code == 201:
-                result = response.json()
-                uploaded = len(result.get('data', []))
-                total_uploaded += uploaded
-                if verbose:
-                    print(f"✓ Batch {batch_num}/{total_batches}: Created {uploaded} test cases")
-            else:
-                if verbose:
-                    print(f"✗ Batch {batch_num}/{total_batches} failed: {response.status_code}", file=sys.stderr)
-                    print(f"  Response: {safe_error_message(response.text)}", file=sys.stderr)
+            with post_json(session, url, {payload_key: batch}, limiter=limiter, breaker=breaker) as response:
+                if response.status_code == 201:
+                    result = response.json()
+                    processed = len(result.get('data', []))
+                    if verbose:
+                        _report(f"✓ Batch {batch_num}/{total_batches}: Created {processed} test cases")
+                    return len(batch), processed
+                else:
+                    if verbose:
+                        _report(
+                            f"✗ Batch {batch_num}/{total_batches} failed: {response.status_code}",
+                            f"  Response: {safe_error_message(read_error_text(response))}",
+                            file=sys.stderr
+                        )
 
         except requests.RequestException as e:
             if verbose:
-                print(f"✗ Batch {batch_num}/{total_batches} failed: {e}", file=sys.stderr)
+                _report(f"✗ Batch {batch_num}/{total_batches} failed: {e}", file=sys.stderr)
+
+        return len(batch), None
+
+    # Batches are independent; the limiter decides how many are in flight
+    return run_batches(post_batch, items, batch_size, max_concurrency)
+
+
+def batch_create_test_cases(
+    test_cases: Iterable[Dict[str, Any]],
+    dataset_type: str,
+    dataset_id: str,
+    batch_size: int = 100,
+    verbose: bool = True,
+    max_concurrency: int = 10,
+    rpm_limit: Optional[int] = None,
+    project_id: Optional[str] = None,
+    session: Optional[requests.Session] = None
+) -> int:
+    """Create test cases in batches.
+
+    Args:
+        test_cases: Iterable of test case dicts (lists or generators)
+        dataset_type: "prompt-datasets" or "agent-datasets"
+        dataset_id: The dataset ID
+        batch_size: Number of items per batch (max 100)
+        verbose: Whether to print progress
+        max_concurrency: Maximum number of batch requests in flight at once
+        rpm_limit: Optional cap on requests per minute
+        project_id: Freeplay project ID (required; lists available projects if missing)
+        session: Optional pre-configured session (defaults to a pooled session)
 
-    return total_uploaded
+    Returns:
+        Number of successfully created test cases
+    """
+    config = get_freeplay_config(project_id)
+    session = session or create_session(config["api_key"], pool_maxsize=max_concurrency)
+
+    url = f"{config['api_base']}/api/v2/projects/{config['project_id']}/{dataset_type}/{dataset_id}/test-cases/bulk"
+
+    results = bulk_request(
+        session,
+        url,
+        test_cases,
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+        rpm_limit=rpm_limit,
+        verbose=verbose
+    )
+    return sum(created for _, created in results if created)
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+../../scripts/envs.py
\ No newline at end of file
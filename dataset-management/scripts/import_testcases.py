@@ -6,32 +6,72 @@ Supports both prompt-level and agent-level datasets.
 """
 
 import argparse
+import codecs
 import json
 import csv
-import os
 import sys
 import requests
-from typing import List, Dict, Any
+from itertools import chain
+from typing import BinaryIO, List, Dict, Any, Iterable, Iterator, Optional, Sized
 
-from secrets import SecretString, safe_error_message
-from api import get_headers, list_projects
+from secrets import SecretString
+from api import create_session, list_projects
+from batch_operations import bulk_request
+from envs import get_env
+
+
+class ParseError(ValueError):
+    """Raised when an input file can't be read past a given line.
+
+    line_num is the first line that wasn't read; everything before it was.
+    """
+
+    def __init__(self, line_num: int, message: str):
+        super().__init__(message)
+        self.line_num = line_num
+
+
+def iter_jsonl(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream test cases from a JSONL file one line at a time.
+
+    Each line is decoded on its own, so a bad byte only affects its line,
+    and parsed with a shared JSONDecoder. Blank lines are ignored.
+
+    Raises:
+        ParseError at the first line that isn't valid JSON or UTF-8
+    """
+    decode = json.JSONDecoder().decode
+    # Binary lines split on "\n" only; a trailing "\r" is JSON whitespace
+    with open(file_path, 'rb') as f:
+        for line_num, raw in enumerate(f, 1):
+            if line_num == 1 and raw.startswith(codecs.BOM_UTF8):
+                raw = raw[len(codecs.BOM_UTF8):]
+            if not raw.strip():
+                continue
+            try:
+                yield decode(raw.decode("utf-8"))
+            except ValueError as e:  # Includes UnicodeDecodeError
+                raise ParseError(line_num, f"Error parsing line {line_num}: {e}")
 
 
 def load_jsonl(file_path: str) -> List[Dict[str, Any]]:
     """Load test cases from JSONL file."""
-    test_cases = []
-    with open(file_path, 'r') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                test_cases.append(json.loads(line))
-            except json.JSONDecodeError as e:
-                print(f"Error parsing line {line_num}: {e}", file=sys.stderr)
-                sys.exit(1)
-    return test_cases
+    return list(iter_jsonl(file_path))
 
 
-def load_csv(file_path: str) -> List[Dict[str, Any]]:
-    """Load test cases from CSV file.
+def _decode_lines(f: BinaryIO) -> Iterator[str]:
+    """Decode a file's lines one at a time, translating "\r\n" like text mode.
+
+    Unlike text mode, which decodes ahead in chunks, a bad byte only fails
+    its own line, so the lines before it are still read.
+    """
+    for line_num, raw in enumerate(f, 1):
+        line = raw.decode("utf-8-sig" if line_num == 1 else "utf-8")
+        yield line[:-2] + "\n" if line.endswith("\r\n") else line
+
+
+def iter_csv(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream test cases from a CSV file one row at a time.
 
     Expected format:
     - Columns starting with "inputs." become inputs dict keys
@@ -41,92 +81,124 @@ def load_csv(file_path: str) -> List[Dict[str, Any]]:
     Example CSV:
     inputs.question,inputs.context,output,category,priority
     "What is...","User context","Expected response","refunds","high"
+
+    Raises:
+        ParseError at the first line that isn't valid UTF-8 or CSV
     """
-    test_cases = []
-    with open(file_path, 'r') as f:
-        reader = csv.DictReader(f)
-        for row_num, row in enumerate(reader, 1):
-            test_case = {
-                "inputs": {},
-                "output": row.get("output", ""),
-                "metadata": {}
-            }
-
-            for key, value in row.items():
+    with open(file_path, 'rb') as f:
+        reader = csv.reader(_decode_lines(f))
+        try:
+            header = next(reader, [])
+
+            # Classify columns once from the header instead of per cell
+            input_cols = []
+            metadata_cols = []
+            output_col = None
+            for index, key in enumerate(header):
                 if key.startswith("inputs."):
-                    input_key = key.replace("inputs.", "")
-                    test_case["inputs"][input_key] = value
+                    input_cols.append((key.replace("inputs.", ""), index))
                 elif key == "output":
-                    test_case["output"] = value
+                    output_col = index
                 elif key:  # Skip empty column names
-                    test_case["metadata"][key] = value
-
-            if not test_case["inputs"]:
-                print(f"Warning: Row {row_num} has no inputs", file=sys.stderr)
+                    metadata_cols.append((key, index))
+
+            row_num = 0
+            for row in reader:
+                if not row:
+                    continue
+                row_num += 1
+                if len(row) < len(header):
+                    row += [None] * (len(header) - len(row))
+
+                test_case = {
+                    "inputs": {key: row[index] for key, index in input_cols},
+                    "output": row[output_col] if output_col is not None else "",
+                    "metadata": {key: row[index] for key, index in metadata_cols}
+                }
+
+                if not test_case["inputs"]:
+                    print(f"Warning: Row {row_num} has no inputs", file=sys.stderr)
+
+                yield test_case
+        except UnicodeDecodeError as e:
+            # Raised while fetching the next line, so the reader hasn't counted it yet
+            bad_line = reader.line_num + 1
+            raise ParseError(bad_line, f"Error parsing line {bad_line}: {e}")
+        except csv.Error as e:
+            raise ParseError(reader.line_num, f"Error parsing line {reader.line_num}: {e}")
 
-            test_cases.append(test_case)
 
-    return test_cases
+def load_csv(file_path: str) -> List[Dict[str, Any]]:
+    """Load test cases from CSV file. See iter_csv() for the expected format."""
+    return list(iter_csv(file_path))
 
 
 def batch_upload(
-    test_cases: List[Dict[str, Any]],
+    test_cases: Iterable[Dict[str, Any]],
     dataset_type: str,
     dataset_id: str,
     api_base: str,
     project_id: str,
     api_key: SecretString,
-    batch_size: int = 100
+    batch_size: int = 100,
+    max_concurrency: int = 10,
+    rpm_limit: Optional[int] = None,
+    session: Optional[requests.Session] = None
 ) -> None:
     """Upload test cases in batches.
 
+    If test_cases raises ParseError, reading stops there: test cases read
+    before it are still uploaded and the summary is printed before exiting.
+
     Args:
-        test_cases: List of test case dicts
+        test_cases: Iterable of test case dicts (lists or generators)
         dataset_type: "prompt-datasets" or "agent-datasets"
         dataset_id: The dataset ID
         api_base: Freeplay API base URL
         project_id: Freeplay project ID
         api_key: SecretString containing the Freeplay API key
         batch_size: Number of test cases per batch (max 100)
+        max_concurrency: Maximum number of batch requests in flight at once
+        rpm_limit: Optional cap on requests per minute
+        session: Optional pre-configured session (defaults to a pooled session)
     """
-    headers = get_headers(api_key)
-
-    total_batches = (len(test_cases) + batch_size - 1) // batch_size
-    successful_batches = 0
-    total_uploaded = 0
+    session = session or create_session(api_key, pool_maxsize=max_concurrency)
+    url = f"{api_base}/api/v2/projects/{project_id}/{dataset_type}/{dataset_id}/test-cases/bulk"
 
-    for i in range(0, len(test_cases), batch_size):
-        batch = test_cases[i:i + batch_size]
-        batch_num = i // batch_size + 1
-
-        url = f"{api_base}/api/v2/projects/{project_id}/{dataset_type}/{dataset_id}/test-cases/bulk"
+    parse_error = None
 
+    def until_parse_error(items: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        nonlocal parse_error
         try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json={"data": batch},
-                timeout=30
-            )
-
-            if response.status_code == 201:
-                result = response.json()
-                uploaded = len(result.get('data', []))
-                total_uploaded += uploaded
-                successful_batches += 1
-                print(f"✓ Batch {batch_num}/{total_batches}: Uploaded {uploaded} test cases")
-            else:
-                print(f"✗ Batch {batch_num}/{total_batches} failed: {response.status_code}", file=sys.stderr)
-                print(f"  Response: {safe_error_message(response.text)}", file=sys.stderr)
-
-        except requests.RequestException as e:
-            print(f"✗ Batch {batch_num}/{total_batches} failed: {e}", file=sys.stderr)
+            yield from items
+        except ParseError as e:
+            parse_error = e
+
+    results = bulk_request(
+        session,
+        url,
+        test_cases if isinstance(test_cases, Sized) else until_parse_error(test_cases),
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+        rpm_limit=rpm_limit
+    )
 
-    print(f"\n{'='*50}")
-    print(f"Upload complete: {total_uploaded}/{len(test_cases)} test cases uploaded")
-    print(f"Successful batches: {successful_batches}/{total_batches}")
+    total_test_cases = sum(size for size, _ in results)
+    successful_batches = sum(1 for _, uploaded in results if uploaded is not None)
+    total_uploaded = sum(uploaded for _, uploaded in results if uploaded is not None)
 
-    if total_uploaded < len(test_cases):
+    print(f"\n{'='*50}")
+    print(f"Upload complete: {total_uploaded}/{total_test_cases} test cases uploaded")
+    print(f"Successful batches: {successful_batches}/{len(results)}")
+
+    if parse_error:
+        print(f"\n{parse_error}", file=sys.stderr)
+        print(
+            f"Import stopped at line {parse_error.line_num}: test cases before it were sent, none after it",
+            file=sys.stderr
+        )
+        sys.exit(1)
+    if total_uploaded < total_test_cases:
         sys.exit(1)
 
 
@@ -152,7 +224,7 @@ def main():
     )
     parser.add_argument(
         "--project-id",
-        help="Freeplay project ID (required; lists available projects if not provided)"
+        help="Freeplay project ID (defaults to FREEPLAY_PROJECT_ID; lists available projects if neither is set)"
     )
     parser.add_argument(
         "--batch-size",
@@ -160,6 +232,17 @@ def main():
         default=100,
         help="Number of test cases per batch (max 100, default: 100)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="Number of batches uploaded in parallel (max 16, default: 10)"
+    )
+    parser.add_argument(
+        "--rpm-limit",
+        type=int,
+        help="Maximum requests per minute (default: no limit beyond server rate-limit headers)"
+    )
 
     args = parser.parse_args()
 
@@ -167,18 +250,19 @@ def main():
     if args.batch_size < 1 or args.batch_size > 100:
         print("Error: batch-size must be between 1 and 100", file=sys.stderr)
         sys.exit(1)
+    if args.concurrency < 1 or args.concurrency > 16:
+        print("Error: concurrency must be between 1 and 16", file=sys.stderr)
+        sys.exit(1)
+    if args.rpm_limit is not None and args.rpm_limit < 1:
+        print("Error: rpm-limit must be at least 1", file=sys.stderr)
+        sys.exit(1)
 
     # Get environment variables
-    api_key = SecretString(os.environ.get("FREEPLAY_API_KEY"))
-    api_base = os.environ.get("FREEPLAY_BASE_URL", "https://app.freeplay.ai")
-    project_id = args.project_id
+    env = get_env()
+    api_key = env.api_key
+    api_base = env.api_base
+    project_id = args.project_id or env.project_id
 
-    if not api_key:
-        print("Error: FREEPLAY_API_KEY environment variable not set", file=sys.stderr)
-        sys.exit(1)
-    if not api_base:
-        print("Error: FREEPLAY_BASE_URL environment variable not set", file=sys.stderr)
-        sys.exit(1)
     if not project_id:
         print("No project ID provided. Use --project-id <id>.", file=sys.stderr)
         print("Fetching available projects...\n", file=sys.stderr)
@@ -188,21 +272,26 @@ def main():
     # Load test cases
     file_ext = args.file.lower().split('.')[-1]
 
-    print(f"Loading test cases from {args.file}...")
-
+    # Test cases are parsed lazily and uploaded as they're read
     if file_ext == 'jsonl':
-        test_cases = load_jsonl(args.file)
+        test_cases = iter_jsonl(args.file)
     elif file_ext == 'csv':
-        test_cases = load_csv(args.file)
+        test_cases = iter_csv(args.file)
     else:
         print(f"Error: Unsupported file type '.{file_ext}'. Use .csv or .jsonl", file=sys.stderr)
         sys.exit(1)
 
-    print(f"✓ Loaded {len(test_cases)} test cases")
+    print(f"Reading test cases from {args.file}...")
 
-    if not test_cases:
+    try:
+        first = next(test_cases, None)
+    except ParseError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    if first is None:
         print("Error: No test cases found in file", file=sys.stderr)
         sys.exit(1)
+    test_cases = chain([first], test_cases)
 
     # Determine dataset type path
     dataset_type = "prompt-datasets" if args.type == "prompt" else "agent-datasets"
@@ -216,7 +305,9 @@ def main():
         api_base=api_base,
         project_id=project_id,
         api_key=api_key,
-        batch_size=args.batch_size
+        batch_size=args.batch_size,
+        max_concurrency=args.concurrency,
+        rpm_limit=args.rpm_limit
     )
 
 
@@ -1,31 +1,373 @@
 #!/usr/bin/env python3
 """Shared Freeplay API utilities."""
 
+import json
+import random
 import sys
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
 import requests
-from typing import Dict
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Optional
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.retry import Retry
 
 from secrets import SecretString
 
 
+# Responses worth retrying: rate limited or a transient gateway/server error
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
 def get_headers(api_key: SecretString) -> Dict[str, str]:
     """Get standard headers for Freeplay API requests.
 
+    Sessions from create_session() already carry these headers, so requests
+    made through them don't need to pass headers= per call.
+
     Args:
         api_key: SecretString containing the API key
     """
     return {
-        "Authorization": f"Bearer {api_key.get()}",
+        "Authorization": api_key.get_bearer(),
         "Content-Type": "application/json"
     }
 
 
-def list_projects(api_base: str, api_key: SecretString):
+def create_session(api_key: SecretString, pool_maxsize: int = 16) -> requests.Session:
+    """Create a pooled session for Freeplay API requests.
+
+    Reuses keep-alive connections across requests so sequential calls to the
+    same host skip repeated TCP/TLS setup. Auth headers are set once on the
+    session, and idempotent requests are retried with backoff on transient
+    failures. POST retries are handled by post_json() so that every attempt
+    goes through the rate limiter.
+
+    Args:
+        api_key: SecretString containing the API key
+        pool_maxsize: Connections kept alive per host; set this to at least
+            the number of threads sharing the session, or extra connections
+            are opened and discarded after each request
+    """
+    # connect=0: urllib3 retries connection errors for every method, which
+    # would nest inside post_json's own retries
+    retries = Retry(
+        total=3,
+        connect=0,
+        backoff_factor=0.5,
+        status_forcelist=sorted(RETRY_STATUSES),
+        allowed_methods=["DELETE", "GET"],
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retries)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(get_headers(api_key))
+    return session
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds to wait."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """Thread-safe request limiter that adapts to the server's rate limits.
+
+    Concurrency follows AIMD: it grows by 0.5 after each fast success and
+    halves on 429/5xx, connection errors, or responses slower than
+    target_latency. Rate-limit response headers pause all senders when the
+    remaining budget drops below 10%, and an optional requests-per-minute
+    cap is enforced over a sliding 60s window.
+
+    Example:
+        limiter = AdaptiveLimiter(max_concurrency=10, rpm_limit=600)
+        response = post_json(session, url, payload, limiter=limiter)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        min_concurrency: int = 1,
+        rpm_limit: Optional[int] = None,
+        target_latency: float = 10.0
+    ):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.rpm_limit = rpm_limit
+        self.target_latency = target_latency
+        self.c = float(max_concurrency)
+        self._in_flight = 0
+        self._window = deque()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent, then claim a slot."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._window and now - self._window[0] >= 60:
+                    self._window.popleft()
+
+                wait = self._paused_until - now
+                if self.rpm_limit and len(self._window) >= self.rpm_limit:
+                    wait = max(wait, self._window[0] + 60 - now)
+
+                if wait <= 0 and self._in_flight < int(self.c):
+                    break
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+            self._in_flight += 1
+            self._window.append(now)
+
+    def release(self, response: Optional[requests.Response], latency: float) -> None:
+        """Release a slot and adjust concurrency from the request outcome.
+
+        Args:
+            response: The response, or None if the request raised
+            latency: Seconds the request took
+        """
+        with self._cond:
+            self._in_flight -= 1
+
+            throttled = response is None or response.status_code == 429 or response.status_code >= 500
+            if throttled or latency > self.target_latency:
+                self.c = max(self.min_concurrency, self.c * 0.5)
+            else:
+                self.c = min(self.max_concurrency, self.c + 0.5)
+
+            if response is not None:
+                pause = self._pause_for(response)
+                if pause:
+                    self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+            self._cond.notify_all()
+
+    def cancel(self) -> None:
+        """Release a slot for a request that was never sent."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @staticmethod
+    def _pause_for(response: requests.Response) -> Optional[float]:
+        """Seconds to pause all senders based on rate-limit headers."""
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if response.status_code == 429:
+            return retry_after if retry_after is not None else 1.0
+
+        remaining = response.headers.get("x-ratelimit-remaining-requests")
+        limit = response.headers.get("x-ratelimit-limit-requests")
+        try:
+            nearly_exhausted = remaining is not None and limit is not None and int(remaining) < 0.1 * int(limit)
+        except ValueError:
+            return None
+        if nearly_exhausted:
+            return retry_after if retry_after is not None else 1.0
+        return None
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised when a request is skipped because the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Fail fast once the API is clearly down.
+
+    Opens after failure_threshold consecutive failed requests (after
+    retries). While open, requests are rejected immediately; once
+    reset_timeout has passed a single trial request is let through, and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def is_open(self) -> bool:
+        """Whether requests are currently being rejected."""
+        with self._lock:
+            return self._opened_at is not None and not self._trial_in_flight
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+def backoff_delay(attempt: int, initial: float = 0.5, maximum: float = 30.0) -> float:
+    """Exponential backoff with jitter for the given 1-based retry attempt."""
+    return min(maximum, initial * 2 ** (attempt - 1) + random.uniform(0, initial))
+
+
+def encode_json(payload: Any) -> bytes:
+    """Serialize a payload to compact UTF-8 JSON bytes for a request body.
+
+    Raises:
+        requests.exceptions.InvalidJSONError if the payload contains NaN/Infinity
+    """
+    try:
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode("utf-8")
+    except ValueError as e:
+        raise requests.exceptions.InvalidJSONError(e)
+
+
+def _failed_to_connect(error: requests.ConnectionError) -> bool:
+    """Whether a request failed while connecting, before any of it was sent."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0] if error.args else None, "reason", None)
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def post_json(
+    session: requests.Session,
+    url: str,
+    payload: Any,
+    limiter: Optional[AdaptiveLimiter] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    max_attempts: int = 6,
+    timeout: float = 30
+) -> requests.Response:
+    """POST a JSON payload with retries, rate limiting, and circuit breaking.
+
+    Failures to connect and RETRY_STATUSES responses are retried up to
+    max_attempts times with exponential backoff and jitter, waiting longer
+    if the server's Retry-After asks for it. Read timeouts and connections
+    dropped after the request went out are not retried, since the server
+    may have acted on the request. Each attempt is paced through the optional AdaptiveLimiter.
+    The payload is encoded once up front and the same bytes are reused for
+    every attempt.
+
+    The response is streamed: its body is only downloaded when read, so
+    callers should use it as a context manager (or close it) and can read
+    just a prefix of error bodies with read_error_text().
+
+    Returns:
+        The final response, which may still be an error status
+
+    Raises:
+        CircuitOpenError if the circuit breaker is open
+        requests.RequestException if the request failed without a response
+    """
+    body = encode_json(payload)
+
+    # Whether this call holds a breaker slot (and so must report its outcome)
+    admitted = False
+    failed = True
+    try:
+        for attempt in range(1, max_attempts + 1):
+            if limiter:
+                limiter.acquire()
+            # Re-check after waiting on the limiter: the circuit may have opened meanwhile
+            if breaker:
+                if attempt == 1:
+                    admitted = allowed = breaker.allow()
+                else:
+                    allowed = not breaker.is_open()
+                if not allowed:
+                    # Another request opened the circuit and already reported it
+                    admitted = False
+                    if limiter:
+                        limiter.cancel()
+                    raise CircuitOpenError("Skipped: API is failing repeatedly, not sending more requests")
+
+            started = time.monotonic()
+            response = None
+            try:
+                response = session.post(url, data=body, timeout=timeout, stream=True)
+            except requests.ConnectionError as e:
+                # Only resend if nothing reached the server. Anything later
+                # ("Connection aborted", ReadTimeout) means it may have received
+                # the bulk create, so retrying it could create duplicates.
+                if attempt == max_attempts or not _failed_to_connect(e):
+                    raise
+            finally:
+                if limiter:
+                    limiter.release(response, time.monotonic() - started)
+
+            if response is not None:
+                if response.status_code not in RETRY_STATUSES or attempt == max_attempts:
+                    failed = response.status_code in RETRY_STATUSES or response.status_code >= 500
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                # Drain the (small) error body so the connection returns to the pool
+                response.content
+            else:
+                retry_after = None
+
+            delay = backoff_delay(attempt)
+            time.sleep(max(retry_after, delay) if retry_after is not None else delay)
+    finally:
+        # Always report, even if reading a response raised, so a trial request
+        # can't leave the breaker stuck half-open
+        if breaker and admitted:
+            if failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+
+def read_error_text(response: requests.Response, max_bytes: int = 8192) -> str:
+    """Read at most max_bytes of a streamed response body as text.
+
+    Error bodies are only shown truncated (see safe_error_message()), so
+    there's no need to download all of a large one.
+    """
+    body = b""
+    for chunk in response.iter_content(chunk_size=1024):
+        body += chunk
+        if len(body) >= max_bytes:
+            break
+    return body[:max_bytes].decode(response.encoding or "utf-8", errors="replace")
+
+
+def list_projects(
+    api_base: str,
+    api_key: SecretString,
+    session: Optional[requests.Session] = None
+):
     """List available Freeplay projects."""
-    headers = get_headers(api_key)
+    session = session or create_session(api_key)
     url = f"{api_base}/api/v2/projects/all"
     try:
-        response = requests.get(url, headers=headers)
+        response = session.get(url, timeout=30)
         response.raise_for_status()
         projects = response.json().get("projects", [])
         if not projects:
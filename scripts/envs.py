@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Freeplay settings read from environment variables.
+
+The environment is read and validated once per process. Use get_env()
+instead of reading os.environ directly so every script agrees on variable
+names and defaults.
+"""
+
+import functools
+import os
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+from secrets import SecretString
+
+DEFAULT_BASE_URL = "https://app.freeplay.ai"
+
+
+@dataclass(frozen=True)
+class Env:
+    """Freeplay settings from the environment.
+
+    Attributes:
+        api_key: FREEPLAY_API_KEY, wrapped so it can't leak into logs
+        api_base: FREEPLAY_BASE_URL, without the /api suffix
+        project_id: FREEPLAY_PROJECT_ID, if set
+    """
+
+    api_key: SecretString
+    api_base: str
+    project_id: Optional[str]
+
+
+@functools.lru_cache(maxsize=None)
+def get_env() -> Env:
+    """Read and validate Freeplay environment variables (cached).
+
+    Raises:
+        SystemExit if required environment variables are missing
+    """
+    api_key = SecretString(os.environ.get("FREEPLAY_API_KEY"))
+    api_base = os.environ.get("FREEPLAY_BASE_URL", DEFAULT_BASE_URL)
+
+    missing = []
+    if not api_key:
+        missing.append("FREEPLAY_API_KEY")
+    if not api_base:
+        missing.append("FREEPLAY_BASE_URL")
+
+    if missing:
+        print(f"Error: Missing environment variables: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+
+    return Env(
+        api_key=api_key,
+        api_base=api_base.rstrip("/"),
+        project_id=os.environ.get("FREEPLAY_PROJECT_ID") or None
+    )
@@ -17,16 +17,21 @@ class SecretString:
     Example:
         api_key = SecretString(os.environ.get("FREEPLAY_API_KEY"))
         print(api_key)  # Output: [REDACTED]
-        headers = {"Authorization": f"Bearer {api_key.get()}"}  # Uses real value
+        headers = {"Authorization": api_key.get_bearer()}  # Uses real value
     """
 
     def __init__(self, value: Optional[str]):
         self._value = value
+        self._bearer = f"Bearer {value}" if value else None
 
     def get(self) -> Optional[str]:
         """Get the actual secret value."""
         return self._value
 
+    def get_bearer(self) -> Optional[str]:
+        """Get the value as a precomputed "Bearer <value>" Authorization header."""
+        return self._bearer
+
     def __str__(self) -> str:
         return "[REDACTED]" if self._value else ""
 
@@ -37,19 +42,26 @@ class SecretString:
         return bool(self._value)
 
 
-# Common patterns for API keys and secrets
+def _probe(*keywords: str) -> "re.Pattern[str]":
+    """Compile a cheap check for keywords, using the same case rules as the patterns."""
+    return re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+
+
+# Common patterns for API keys and secrets. Each pattern is paired with a
+# probe for the keywords it requires, so patterns that can't match are
+# skipped without running the full pattern.
 _SECRET_PATTERNS = [
     # Bearer tokens in headers
-    (re.compile(r'(Bearer\s+)[A-Za-z0-9_\-\.]+', re.IGNORECASE), r'\1[REDACTED]'),
+    (_probe("bearer"), re.compile(r'(Bearer\s+)[A-Za-z0-9_\-\.]+', re.IGNORECASE), r'\1[REDACTED]'),
     # Authorization headers
-    (re.compile(r'(Authorization["\']?\s*:\s*["\']?)[^"\'}\s]+', re.IGNORECASE), r'\1[REDACTED]'),
+    (_probe("authorization"), re.compile(r'(Authorization["\']?\s*:\s*["\']?)[^"\'}\s]+', re.IGNORECASE), r'\1[REDACTED]'),
     # API key patterns (common formats)
-    (re.compile(r'(api[_-]?key["\']?\s*[:=]\s*["\']?)[A-Za-z0-9_\-\.]+', re.IGNORECASE), r'\1[REDACTED]'),
+    (_probe("apikey", "api_key", "api-key"), re.compile(r'(api[_-]?key["\']?\s*[:=]\s*["\']?)[A-Za-z0-9_\-\.]+', re.IGNORECASE), r'\1[REDACTED]'),
     # Generic secret/token patterns
-    (re.compile(r'(secret["\']?\s*[:=]\s*["\']?)[A-Za-z0-9_\-\.]+', re.IGNORECASE), r'\1[REDACTED]'),
-    (re.compile(r'(token["\']?\s*[:=]\s*["\']?)[A-Za-z0-9_\-\.]+', re.IGNORECASE), r'\1[REDACTED]'),
+    (_probe("secret"), re.compile(r'(secret["\']?\s*[:=]\s*["\']?)[A-Za-z0-9_\-\.]+', re.IGNORECASE), r'\1[REDACTED]'),
+    (_probe("token"), re.compile(r'(token["\']?\s*[:=]\s*["\']?)[A-Za-z0-9_\-\.]+', re.IGNORECASE), r'\1[REDACTED]'),
     # Freeplay specific patterns
-    (re.compile(r'(FREEPLAY_API_KEY\s*=\s*)[^\s]+', re.IGNORECASE), r'\1[REDACTED]'),
+    (_probe("freeplay_api_key"), re.compile(r'(FREEPLAY_API_KEY\s*=\s*)[^\s]+', re.IGNORECASE), r'\1[REDACTED]'),
 ]
 
 
@@ -67,10 +79,19 @@ def redact_secrets(text: str) -> str:
 
     Returns:
         Text with secrets replaced by [REDACTED]
+
+    Example:
+        >>> redact_secrets('{"api_key": "abc123"}')
+        '{"api_key": "[REDACTED]"}'
+        >>> redact_secrets("apİ_key=abc123")  # IGNORECASE also matches İ/ı to i
+        'apİ_key=[REDACTED]'
+        >>> redact_secrets("Authorization: Bearer sk-123")
+        'Authorization: [REDACTED] [REDACTED]'
     """
     result = text
-    for pattern, replacement in _SECRET_PATTERNS:
-        result = pattern.sub(replacement, result)
+    for probe, pattern, replacement in _SECRET_PATTERNS:
+        if probe.search(text):
+            result = pattern.sub(replacement, result)
     return result
 
 